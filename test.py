@@ -1,14 +1,25 @@
 import sys
 import json
 import os
+import threading
+import itertools
+from operator import itemgetter
+import hmac
+from datetime import datetime, timedelta
+from urllib.parse import urlparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QLineEdit, QPushButton, QTableWidget, QTableWidgetItem,
     QHeaderView, QSystemTrayIcon, QMenu, QAction, QMessageBox,
-    QLabel, QSizePolicy, QTabWidget, QStyle, QInputDialog
+    QLabel, QSizePolicy, QTabWidget, QStyle, QInputDialog, QTableView,
+    QScrollArea, QFrame
 )
 from PyQt5.QtGui import QIcon, QDesktopServices, QMouseEvent
-from PyQt5.QtCore import QUrl, Qt, QPoint, pyqtSignal
+from PyQt5.QtCore import (
+    QUrl, Qt, QPoint, QObject, QTimer, pyqtSignal, QAbstractTableModel, QModelIndex
+)
+from PyQt5.QtNetwork import QLocalServer, QLocalSocket, QAbstractSocket
 
 # --- Cấu hình ---
 ALL_BOOKMARKS_FILE = 'categories.json' # File JSON mới để lưu tất cả dữ liệu
@@ -17,6 +28,13 @@ MINIMIZE_ICON_PATH = 'assets/minimize_icon.png'
 MAXIMIZE_ICON_PATH = 'assets/maximize_icon.png'
 RESTORE_ICON_PATH = 'assets/restore_icon.png'
 CLOSE_ICON_PATH = 'assets/close_icon.png'
+IPC_SERVER_NAME = 'bookmark_manager_ipc' # Tên local socket cho single-instance
+IPC_HTTP_PORT = None # Đặt cổng (vd. 8765) để bật HTTP listener trên 127.0.0.1
+IPC_HTTP_TOKEN = '' # Bắt buộc khi bật HTTP listener: request phải gửi header X-Bookmark-Token khớp giá trị này
+IPC_FLUSH_INTERVAL_MS = 50 # Gom các lệnh add trong khoảng này thành một lần lưu
+IPC_CONNECT_TIMEOUT_MS = 500
+SMART_COLLECTIONS_FILE = 'collections.json' # Các truy vấn đã lưu (smart collection)
+SMART_COLLECTION_REFRESH_MS = 60 * 60 * 1000 # Làm mới các collection theo thời gian
 
 
 # --- Custom Title Bar Widget ---
@@ -147,20 +165,736 @@ class CustomTitleBar(QWidget):
             self._set_button_icon(self.max_res_btn, MAXIMIZE_ICON_PATH, QStyle.SP_TitleBarMaxButton)
 
 
+# --- IPC: single instance + nhận bookmark từ bên ngoài ---
+def parse_command_line(args):
+    """Chuyển tham số dòng lệnh thành lệnh IPC.
+
+    test.py                              -> show
+    test.py add <category> <title> [url] -> add
+    """
+    if len(args) >= 3 and args[0] == 'add':
+        command = {'cmd': 'add', 'category': args[1], 'title': args[2]}
+        if len(args) >= 4:
+            command['url'] = args[3]
+        return command
+    return {'cmd': 'show'}
+
+
+def _connect_to_running_instance():
+    socket = QLocalSocket()
+    socket.connectToServer(IPC_SERVER_NAME)
+    if not socket.waitForConnected(IPC_CONNECT_TIMEOUT_MS):
+        return None
+    return socket
+
+
+def send_to_running_instance(command):
+    """Gửi lệnh tới instance đang chạy. Trả về False nếu chưa có instance nào."""
+    socket = _connect_to_running_instance()
+    if socket is None:
+        return False
+
+    socket.write((json.dumps(command, ensure_ascii=False) + '\n').encode('utf-8'))
+    socket.flush()
+    socket.waitForBytesWritten(IPC_CONNECT_TIMEOUT_MS)
+    socket.disconnectFromServer()
+    return True
+
+
+class _IpcHttpHandler(BaseHTTPRequestHandler):
+    """POST một lệnh JSON (hoặc danh sách lệnh) tới http://127.0.0.1:<port>/.
+
+    Mọi request phải có header X-Bookmark-Token khớp IPC_HTTP_TOKEN. Origin nào
+    cũng được chấp nhận (extension gửi chrome-extension://..., moz-extension://...);
+    trang web không biết token nên không chèn được bookmark.
+    """
+
+    def end_headers(self):
+        origin = self.headers.get('Origin')
+        if origin is not None:
+            self.send_header('Access-Control-Allow-Origin', origin)
+            self.send_header('Vary', 'Origin')
+        super().end_headers()
+
+    def do_OPTIONS(self):
+        # CORS preflight: header X-Bookmark-Token không phải "simple header"
+        self.send_response(204)
+        self.send_header('Access-Control-Allow-Methods', 'POST, OPTIONS')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type, X-Bookmark-Token')
+        self.send_header('Access-Control-Max-Age', '600')
+        self.end_headers()
+
+    def do_POST(self):
+        token = self.headers.get('X-Bookmark-Token', '')
+        if not IPC_HTTP_TOKEN or not hmac.compare_digest(token.encode('utf-8'), IPC_HTTP_TOKEN.encode('utf-8')):
+            self.send_error(403, "Invalid token")
+            return
+
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+        except ValueError:
+            length = -1
+        if length < 0:
+            self.send_error(400, "Invalid Content-Length")
+            return
+
+        try:
+            payload = json.loads(self.rfile.read(length).decode('utf-8'))
+        except (ValueError, UnicodeDecodeError):
+            self.send_error(400, "Invalid JSON")
+            return
+
+        commands = payload if isinstance(payload, list) else [payload]
+        for command in commands:
+            if isinstance(command, dict):
+                # Signal emit từ thread HTTP sẽ được Qt chuyển về main thread (queued)
+                self.server.ipc_server.command_received.emit(command)
+
+        self.send_response(202)
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class BookmarkIpcServer(QObject):
+    """Giữ socket single-instance ngay khi tạo; lệnh nhận được trước start() được xếp hàng."""
+    command_received = pyqtSignal(object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.socket_buffers = {}
+        self.listen_errors = [] # Lỗi khi mở endpoint, để app báo cho người dùng
+        self.pending_commands = []
+        self.started = False
+        self.http_server = None
+
+        self.local_server = QLocalServer(self)
+        if sys.platform == 'win32':
+            self.local_server.setSocketOptions(QLocalServer.UserAccessOption) # chỉ user hiện tại được kết nối
+        self.local_server.newConnection.connect(self._accept_local_connections)
+        self._listen_local()
+
+    def _listen(self):
+        if sys.platform == 'win32':
+            return self.local_server.listen(IPC_SERVER_NAME)
+        # Trên Unix, UserAccessOption bind vào thư mục tạm rồi rename đè lên socket đang có,
+        # nên không bao giờ báo AddressInUseError. Dùng umask để chỉ user hiện tại kết nối được.
+        old_umask = os.umask(0o077)
+        try:
+            return self.local_server.listen(IPC_SERVER_NAME)
+        finally:
+            os.umask(old_umask)
+
+    def _listen_local(self):
+        if self._listen():
+            return
+        if (self.local_server.serverError() == QAbstractSocket.AddressInUseError
+                and _connect_to_running_instance() is None):
+            # Socket cũ sót lại sau khi instance trước bị crash (Unix), không ai đang nghe
+            QLocalServer.removeServer(IPC_SERVER_NAME)
+            if self._listen():
+                return
+        self.listen_errors.append(
+            f"Could not open the single-instance socket ({self.local_server.errorString()}). "
+            "Other launches will start a separate instance."
+        )
+
+    def is_listening(self):
+        return self.local_server.isListening()
+
+    def start(self):
+        """Gọi khi app đã sẵn sàng xử lý lệnh: phát các lệnh đang chờ và mở HTTP listener."""
+        self.started = True
+        pending, self.pending_commands = self.pending_commands, []
+        for command in pending:
+            self.command_received.emit(command)
+
+        if IPC_HTTP_PORT:
+            self._start_http_listener(IPC_HTTP_PORT)
+
+    def _start_http_listener(self, port):
+        if not IPC_HTTP_TOKEN:
+            # Không có token thì mọi user/tiến trình trên máy đều ghi được vào store của user này
+            self.listen_errors.append(
+                f"The HTTP listener on port {port} was not started: set IPC_HTTP_TOKEN to enable it."
+            )
+            return
+        try:
+            self.http_server = ThreadingHTTPServer(('127.0.0.1', port), _IpcHttpHandler)
+        except OSError as e:
+            self.listen_errors.append(f"Could not start the HTTP listener on port {port}: {e}")
+            return
+        self.http_server.ipc_server = self
+        threading.Thread(target=self.http_server.serve_forever, daemon=True).start()
+
+    def _accept_local_connections(self):
+        while self.local_server.hasPendingConnections():
+            socket = self.local_server.nextPendingConnection()
+            self.socket_buffers[socket] = b''
+            socket.readyRead.connect(lambda s=socket: self._read_local_socket(s))
+            socket.disconnected.connect(lambda s=socket: self._close_local_socket(s))
+
+    def _read_local_socket(self, socket):
+        buffer = self.socket_buffers.get(socket, b'') + bytes(socket.readAll())
+        *lines, self.socket_buffers[socket] = buffer.split(b'\n')
+        for line in lines:
+            self._emit_line(line)
+
+    def _close_local_socket(self, socket):
+        self._read_local_socket(socket)
+        self._emit_line(self.socket_buffers.pop(socket, b''))
+        socket.deleteLater()
+
+    def _emit_line(self, line):
+        if not line.strip():
+            return
+        try:
+            command = json.loads(line.decode('utf-8'))
+        except (ValueError, UnicodeDecodeError):
+            return
+        if not isinstance(command, dict):
+            return
+        if self.started:
+            self.command_received.emit(command)
+        else:
+            self.pending_commands.append(command)
+
+    def close(self):
+        self.local_server.close()
+        if self.http_server is not None:
+            self.http_server.shutdown()
+            self.http_server.server_close()
+
+
+# --- Tags ---
+def parse_tags(value):
+    """Chuẩn hoá tags từ chuỗi 'a, b' hoặc list -> list lowercase, không trùng."""
+    if isinstance(value, str):
+        value = value.split(',')
+    elif not isinstance(value, list):
+        return []
+    tags = []
+    for tag in value:
+        if isinstance(tag, bool) or not isinstance(tag, (str, int, float)):
+            continue
+        tag = str(tag).strip().lower()
+        if tag and tag not in tags:
+            tags.append(tag)
+    return tags
+
+
+class TagIndex:
+    """Index tag -> bitmap trên toàn bộ bookmark.
+
+    Mỗi bookmark (dict) được gán một id nội bộ; bitmap là một int Python với
+    bit thứ id được bật, nên AND/OR/NOT giữa các tag chỉ là phép toán bit.
+    Id không được tái sử dụng sau khi xoá.
+    """
+
+    def __init__(self):
+        self.bitmaps = {}
+        self.all_ids = 0
+        self.bookmarks_by_id = {}
+        self.ids_by_bookmark = {} # id(dict) -> bookmark id; dict được giữ sống trong bookmarks_by_id
+        self.next_id = 0
+        self.version = 0 # Tăng sau mỗi thay đổi, để cache kết quả truy vấn biết khi nào hết hạn
+
+    def rebuild(self, categories_data):
+        """Dựng lại toàn bộ index một lần (dùng khi load file)."""
+        self.bookmarks_by_id = {}
+        self.ids_by_bookmark = {}
+        self.next_id = 0
+        ids_by_tag = {}
+        for bookmarks in categories_data.values():
+            for bookmark in bookmarks:
+                bookmark_id = self._register(bookmark)
+                for tag in bookmark.get('tags', []):
+                    ids_by_tag.setdefault(tag, []).append(bookmark_id)
+
+        self.all_ids = self._bitmap_from_ids(range(self.next_id))
+        self.bitmaps = {tag: self._bitmap_from_ids(ids) for tag, ids in ids_by_tag.items()}
+        self.version += 1
+
+    def _bitmap_from_ids(self, ids):
+        bits = bytearray((self.next_id + 7) // 8)
+        for bookmark_id in ids:
+            bits[bookmark_id >> 3] |= 1 << (bookmark_id & 7)
+        return int.from_bytes(bits, 'little')
+
+    def _register(self, bookmark):
+        bookmark_id = self.next_id
+        self.next_id += 1
+        self.bookmarks_by_id[bookmark_id] = bookmark
+        self.ids_by_bookmark[id(bookmark)] = bookmark_id
+        return bookmark_id
+
+    def id_of(self, bookmark):
+        return self.ids_by_bookmark.get(id(bookmark))
+
+    def add(self, bookmark):
+        bookmark_id = self._register(bookmark)
+        bit = 1 << bookmark_id
+        self.all_ids |= bit
+        for tag in bookmark.get('tags', []):
+            self.bitmaps[tag] = self.bitmaps.get(tag, 0) | bit
+        self.version += 1
+        return bookmark_id
+
+    def remove(self, bookmark):
+        bookmark_id = self.ids_by_bookmark.pop(id(bookmark), None)
+        if bookmark_id is None:
+            return
+        del self.bookmarks_by_id[bookmark_id]
+        mask = ~(1 << bookmark_id)
+        self.all_ids &= mask
+        self._clear_tags(bookmark.get('tags', []), mask)
+        self.version += 1
+
+    def retag(self, bookmark, tags):
+        """Đổi tags của bookmark, chỉ cập nhật bitmap của các tag thay đổi."""
+        bookmark_id = self.id_of(bookmark)
+        old_tags = bookmark.get('tags', [])
+        if tags:
+            bookmark['tags'] = tags
+        else:
+            bookmark.pop('tags', None)
+        if bookmark_id is None:
+            return
+
+        bit = 1 << bookmark_id
+        self._clear_tags([tag for tag in old_tags if tag not in tags], ~bit)
+        for tag in tags:
+            if tag not in old_tags:
+                self.bitmaps[tag] = self.bitmaps.get(tag, 0) | bit
+        self.version += 1
+
+    def _clear_tags(self, tags, mask):
+        for tag in tags:
+            bitmap = self.bitmaps.get(tag, 0) & mask
+            if bitmap:
+                self.bitmaps[tag] = bitmap
+            else:
+                self.bitmaps.pop(tag, None)
+
+    def tags(self):
+        return sorted(self.bitmaps.keys())
+
+    def query(self, all_of=(), any_of=(), none_of=()):
+        """Trả về bitmap các bookmark có mọi tag trong all_of, ít nhất một tag
+        trong any_of (nếu có) và không có tag nào trong none_of."""
+        result = self.all_ids
+        for tag in all_of:
+            result &= self.bitmaps.get(tag, 0)
+        if any_of:
+            union = 0
+            for tag in any_of:
+                union |= self.bitmaps.get(tag, 0)
+            result &= union
+        for tag in none_of:
+            result &= ~self.bitmaps.get(tag, 0)
+        return result
+
+    def bytes_from_bitmap(self, bitmap):
+        """Chuyển bitmap sang bytes (little-endian) để test từng bit với chi phí O(1)."""
+        return bitmap.to_bytes((self.next_id + 7) // 8, 'little')
+
+    def has_bit(self, bitmap_bytes, bookmark):
+        bookmark_id = self.id_of(bookmark)
+        if bookmark_id is None or (bookmark_id >> 3) >= len(bitmap_bytes):
+            return False
+        return bool(bitmap_bytes[bookmark_id >> 3] >> (bookmark_id & 7) & 1)
+
+
+class TagFilterBar(QWidget):
+    """Hàng chip tag: bấm để chuyển off -> include -> exclude -> off."""
+    filter_changed = pyqtSignal()
+
+    CHIP_STATES = ('off', 'include', 'exclude')
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setObjectName("tag_filter_bar")
+        self.chip_states = {}
+        self.chip_buttons = {}
+        self.match_any = False
+
+        bar_layout = QHBoxLayout(self)
+        bar_layout.setContentsMargins(10, 5, 10, 5)
+        bar_layout.setSpacing(5)
+        bar_layout.addWidget(QLabel("Tags:"))
+
+        # Chip nằm trong vùng cuộn ngang để nhiều tag không đẩy rộng cửa sổ
+        chips_container = QWidget()
+        self.chips_layout = QHBoxLayout(chips_container)
+        self.chips_layout.setContentsMargins(0, 0, 0, 0)
+        self.chips_layout.setSpacing(5)
+        self.chips_layout.addStretch()
+
+        self.chips_scroll_area = QScrollArea()
+        self.chips_scroll_area.setObjectName("tag_chips_scroll_area")
+        self.chips_scroll_area.setWidget(chips_container)
+        self.chips_scroll_area.setWidgetResizable(True)
+        self.chips_scroll_area.setFrameShape(QFrame.NoFrame)
+        self.chips_scroll_area.setHorizontalScrollBarPolicy(Qt.ScrollBarAsNeeded)
+        self.chips_scroll_area.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.chips_scroll_area.setFixedHeight(48)
+        bar_layout.addWidget(self.chips_scroll_area, 1)
+
+        self.mode_button = QPushButton("MATCH ALL")
+        self.mode_button.setObjectName("tag_mode_button")
+        self.mode_button.clicked.connect(self.toggle_match_mode)
+        bar_layout.addWidget(self.mode_button)
+
+        self.clear_button = QPushButton("CLEAR")
+        self.clear_button.setObjectName("tag_mode_button")
+        self.clear_button.clicked.connect(self.clear_filter)
+        bar_layout.addWidget(self.clear_button)
+
+        self.setVisible(False)
+
+    def set_tags(self, tags):
+        """Cập nhật danh sách chip, giữ trạng thái của các tag vẫn còn tồn tại."""
+        if list(self.chip_buttons.keys()) == tags:
+            return
+
+        for button in self.chip_buttons.values():
+            self.chips_layout.removeWidget(button)
+            button.deleteLater()
+        self.chip_buttons.clear()
+
+        removed_active = any(state != 'off' for tag, state in self.chip_states.items() if tag not in tags)
+        self.chip_states = {tag: self.chip_states.get(tag, 'off') for tag in tags}
+
+        for position, tag in enumerate(tags):
+            button = QPushButton(tag)
+            button.setObjectName("tag_chip")
+            button.clicked.connect(lambda checked, t=tag: self.cycle_chip(t))
+            self.chips_layout.insertWidget(position, button)
+            self.chip_buttons[tag] = button
+            self._update_chip_style(tag)
+
+        self.setVisible(bool(tags))
+        if removed_active:
+            self.filter_changed.emit()
+
+    def _update_chip_style(self, tag):
+        button = self.chip_buttons[tag]
+        state = self.chip_states[tag]
+        button.setProperty("tag_state", state)
+        button.setText({'include': f"+ {tag}", 'exclude': f"- {tag}"}.get(state, tag))
+        button.style().unpolish(button)
+        button.style().polish(button)
+
+    def cycle_chip(self, tag):
+        current = self.CHIP_STATES.index(self.chip_states[tag])
+        self.chip_states[tag] = self.CHIP_STATES[(current + 1) % len(self.CHIP_STATES)]
+        self._update_chip_style(tag)
+        self.filter_changed.emit()
+
+    def toggle_match_mode(self):
+        self.match_any = not self.match_any
+        self.mode_button.setText("MATCH ANY" if self.match_any else "MATCH ALL")
+        if self.included_tags():
+            self.filter_changed.emit()
+
+    def clear_filter(self):
+        if not self.is_active():
+            return
+        for tag in self.chip_states:
+            self.chip_states[tag] = 'off'
+            self._update_chip_style(tag)
+        self.filter_changed.emit()
+
+    def included_tags(self):
+        return [tag for tag, state in self.chip_states.items() if state == 'include']
+
+    def excluded_tags(self):
+        return [tag for tag, state in self.chip_states.items() if state == 'exclude']
+
+    def is_active(self):
+        return any(state != 'off' for state in self.chip_states.values())
+
+
+# --- Smart Collections ---
+SMART_COLLECTION_KINDS = {
+    'url_host': "URL host is",
+    'no_url': "No URL",
+    'added_within_days': "Added in the last N days",
+    'tag': "Has tag",
+    'title_contains': "Title contains",
+}
+
+DEFAULT_SMART_COLLECTIONS = [
+    {'name': "GitHub", 'kind': 'url_host', 'value': 'github.com'},
+    {'name': "No URL", 'kind': 'no_url'},
+    {'name': "This Week", 'kind': 'added_within_days', 'value': 7},
+]
+
+
+class _LiveRowCounter:
+    """Fenwick tree đếm các slot còn sống: slot <-> số dòng trong O(log n)."""
+
+    def __init__(self, count=0):
+        self.size = count
+        self.tree = [0] + [1] * count
+        for i in range(1, count + 1):
+            parent = i + (i & -i)
+            if parent <= count:
+                self.tree[parent] += self.tree[i]
+
+    def append(self):
+        self.size += 1
+        i = self.size
+        self.tree.append(1 + self.prefix(i - 1) - self.prefix(i - (i & -i)))
+
+    def remove(self, slot):
+        i = slot + 1
+        while i <= self.size:
+            self.tree[i] -= 1
+            i += i & -i
+
+    def prefix(self, slot):
+        """Số slot còn sống trong [0, slot) = số dòng của slot."""
+        total = 0
+        while slot > 0:
+            total += self.tree[slot]
+            slot -= slot & -slot
+        return total
+
+    def find(self, row):
+        """Slot của dòng thứ row."""
+        slot = 0
+        step = 1 << self.size.bit_length()
+        while step:
+            if slot + step <= self.size and self.tree[slot + step] <= row:
+                slot += step
+                row -= self.tree[slot]
+            step >>= 1
+        return slot
+
+
+class SmartCollectionModel(QAbstractTableModel):
+    """Materialized view của một truy vấn đã lưu.
+
+    Giữ sẵn danh sách (category, bookmark) khớp với predicate; mỗi thay đổi
+    chỉ kiểm tra bookmark bị ảnh hưởng thay vì chạy lại truy vấn trên cả store.
+    Là model Qt nên view chỉ đọc các dòng đang hiển thị.
+
+    Dòng bị xoá chỉ được đánh dấu (slot = None) rồi dọn dần, nên xoá một
+    bookmark không phải dịch chỉ số của mọi dòng phía sau.
+    """
+    HEADERS = ["Title", "URL", "Tags", "Category"]
+    COMPACT_MIN_DEAD_SLOTS = 1024
+
+    def __init__(self, name, kind, value=None, parent=None):
+        super().__init__(parent)
+        self.name = name
+        self.kind = kind
+        self.value = value
+        self.slots = [] # (category, bookmark), hoặc None nếu đã bị xoá
+        self.slot_of = {} # id(bookmark) -> slot
+        self.live_rows = _LiveRowCounter()
+
+    @staticmethod
+    def from_dict(definition, parent=None):
+        """Tạo model từ định nghĩa đã lưu; trả về None nếu định nghĩa không hợp lệ."""
+        if not isinstance(definition, dict):
+            return None
+        name = definition.get('name')
+        kind = definition.get('kind')
+        value = definition.get('value')
+        if not isinstance(name, str) or not name.strip() or kind not in SMART_COLLECTION_KINDS:
+            return None
+
+        if kind == 'added_within_days':
+            if isinstance(value, bool):
+                return None
+            try:
+                value = int(value)
+            except (TypeError, ValueError):
+                return None
+            if value < 1:
+                return None
+        elif kind == 'no_url':
+            value = None
+        elif not isinstance(value, str) or not value.strip():
+            return None
+
+        return SmartCollectionModel(name.strip(), kind, value, parent)
+
+    def to_dict(self):
+        data = {'name': self.name, 'kind': self.kind}
+        if self.value is not None:
+            data['value'] = self.value
+        return data
+
+    def is_time_based(self):
+        return self.kind == 'added_within_days'
+
+    def match_context(self):
+        """Tính trước các giá trị dùng chung cho cả một lô bookmark."""
+        if self.kind == 'added_within_days':
+            cutoff = datetime.now() - timedelta(days=int(self.value))
+            return cutoff.isoformat(timespec='seconds')
+        if self.kind in ('url_host', 'tag', 'title_contains'):
+            return str(self.value).strip().lower()
+        return None
+
+    def matches(self, bookmark, context):
+        url = bookmark.get('url', '')
+        if self.kind == 'url_host':
+            if not url or not isinstance(url, str):
+                return False
+            try:
+                host = urlparse(url).hostname or ''
+            except ValueError: # vd. 'https://[foo' -> Invalid IPv6 URL
+                return False
+            return host == context or host.endswith('.' + context)
+        if self.kind == 'no_url':
+            return not url
+        if self.kind == 'added_within_days':
+            # ISO 8601 cùng định dạng nên so sánh chuỗi là đủ
+            added = bookmark.get('added')
+            return isinstance(added, str) and added >= context
+        if self.kind == 'tag':
+            tags = bookmark.get('tags')
+            return isinstance(tags, list) and context in tags
+        if self.kind == 'title_contains':
+            title = bookmark.get('title')
+            return isinstance(title, str) and context in title.lower()
+        return False
+
+    # --- Cập nhật view ---
+    def rebuild(self, categories_data):
+        context = self.match_context()
+        self.beginResetModel()
+        self._set_slots([(category_name, bookmark)
+                         for category_name, bookmarks in categories_data.items()
+                         for bookmark in bookmarks if self.matches(bookmark, context)])
+        self.endResetModel()
+
+    def _set_slots(self, slots):
+        self.slots = slots
+        self.slot_of = dict(zip(map(id, map(itemgetter(1), slots)), itertools.count()))
+        self.live_rows = _LiveRowCounter(len(slots))
+
+    def add_bookmarks(self, pairs):
+        """Thêm các (category, bookmark) mới khớp predicate vào cuối view."""
+        context = self.match_context()
+        matched = [(category_name, bookmark) for category_name, bookmark in pairs
+                   if id(bookmark) not in self.slot_of and self.matches(bookmark, context)]
+        if not matched:
+            return
+
+        first_row = self.rowCount()
+        self.beginInsertRows(QModelIndex(), first_row, first_row + len(matched) - 1)
+        for pair in matched:
+            self.slot_of[id(pair[1])] = len(self.slots)
+            self.slots.append(pair)
+            self.live_rows.append()
+        self.endInsertRows()
+
+    def remove_bookmarks(self, bookmarks):
+        hits = [id(bookmark) for bookmark in bookmarks if id(bookmark) in self.slot_of]
+        if not hits:
+            return
+
+        if len(hits) == 1:
+            slot = self.slot_of.pop(hits[0])
+            row = self.live_rows.prefix(slot)
+            self.beginRemoveRows(QModelIndex(), row, row)
+            self._kill_slot(slot)
+            self.endRemoveRows()
+        else:
+            self.beginResetModel()
+            for bookmark_key in hits:
+                self._kill_slot(self.slot_of.pop(bookmark_key))
+            self.endResetModel()
+        self._compact_if_needed()
+
+    def _kill_slot(self, slot):
+        self.slots[slot] = None
+        self.live_rows.remove(slot)
+
+    def _compact_if_needed(self):
+        """Dọn slot chết khi chúng nhiều hơn số dòng còn sống; số dòng không đổi."""
+        dead = len(self.slots) - self.rowCount()
+        if dead > max(self.COMPACT_MIN_DEAD_SLOTS, self.rowCount()):
+            self._set_slots([pair for pair in self.slots if pair is not None])
+
+    def update_bookmark(self, category_name, bookmark):
+        """Kiểm tra lại một bookmark đã bị sửa (vd. đổi tags)."""
+        slot = self.slot_of.get(id(bookmark))
+        if self.matches(bookmark, self.match_context()):
+            if slot is not None:
+                row = self.live_rows.prefix(slot)
+                self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.HEADERS) - 1))
+            else:
+                self.add_bookmarks([(category_name, bookmark)])
+        elif slot is not None:
+            self.remove_bookmarks([bookmark])
+
+    def bookmark_at(self, row):
+        return self.slots[self.live_rows.find(row)][1]
+
+    def iter_bookmarks(self, first_row=0):
+        """Duyệt bookmark từ dòng first_row theo thứ tự, bỏ qua slot đã xoá."""
+        if first_row >= self.rowCount():
+            return
+        for pair in itertools.islice(self.slots, self.live_rows.find(first_row), None):
+            if pair is not None:
+                yield pair[1]
+
+    # --- QAbstractTableModel ---
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.slot_of)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role != Qt.DisplayRole:
+            return None
+        category_name, bookmark = self.slots[self.live_rows.find(index.row())]
+        column = index.column()
+        if column == 0:
+            return bookmark.get('title', 'No Title')
+        if column == 1:
+            return bookmark.get('url', '')
+        if column == 2:
+            return ', '.join(bookmark.get('tags', []))
+        return category_name
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+
 #Main Window
 class BookmarkManagerApp(QMainWindow):
     show_window_and_add_bookmark_signal = pyqtSignal()
     show_window_and_add_category_signal = pyqtSignal()
 
-    def __init__(self):
+    def __init__(self, ipc_server=None):
         super().__init__()
         self.categories_data = {} 
         self.category_widgets = {} 
+        self.ipc_server = ipc_server
+        self.pending_ipc_bookmarks = []
+        self.tag_index = TagIndex()
+        self.tag_filter_bytes = None # Kết quả lọc tag dạng bytes; None = chưa tính
+        self.tag_filter_version = None # tag_index.version lúc tính tag_filter_bytes
+        self.smart_collections = {}
+        self.collection_widgets = {}
 
         self.load_all_bookmarks()
+        self.load_smart_collections()
 
         self.init_ui()
         self.init_tray_icon()
+        self.init_ipc_server()
         self.apply_modern_theme() # <-- HÀM apply_modern_theme() ĐƯỢC GỌI Ở ĐÂY
         self.populate_all_tables()
         
@@ -185,8 +919,13 @@ class BookmarkManagerApp(QMainWindow):
         self.title_bar.close_requested.connect(self.close)
         main_layout.addWidget(self.title_bar)
 
+        self.tag_filter_bar = TagFilterBar(self)
+        self.tag_filter_bar.filter_changed.connect(self.apply_tag_filter)
+        main_layout.addWidget(self.tag_filter_bar)
+
         self.tab_widget = QTabWidget()
         self.tab_widget.setObjectName("bookmark_tab_widget")
+        self.tab_widget.currentChanged.connect(self.apply_tag_filter_to_current_tab)
         main_layout.addWidget(self.tab_widget)
         
         #Add Category Button 
@@ -194,11 +933,17 @@ class BookmarkManagerApp(QMainWindow):
         self.add_category_button.setObjectName("add_category_button")
         self.add_category_button.setFixedSize(120, 30)
         self.add_category_button.clicked.connect(self.prompt_new_category)
+
+        self.add_collection_button = QPushButton("+ Add Collection")
+        self.add_collection_button.setObjectName("add_category_button")
+        self.add_collection_button.setFixedSize(120, 30)
+        self.add_collection_button.clicked.connect(self.prompt_new_collection)
         
         add_category_btn_container = QWidget()
         add_category_btn_layout = QHBoxLayout(add_category_btn_container)
         add_category_btn_layout.setContentsMargins(0,0,0,0)
         add_category_btn_layout.addStretch()
+        add_category_btn_layout.addWidget(self.add_collection_button)
         add_category_btn_layout.addWidget(self.add_category_button)
         
         #Add Category Button 
@@ -207,6 +952,8 @@ class BookmarkManagerApp(QMainWindow):
         self.setCentralWidget(main_widget)
         
         self.init_category_tabs() 
+        self.init_collection_tabs()
+        self.refresh_tag_chips()
 
         self.show_window_and_add_bookmark_signal.connect(self.prompt_add_bookmark)
         self.show_window_and_add_category_signal.connect(self.prompt_new_category)
@@ -288,9 +1035,31 @@ class BookmarkManagerApp(QMainWindow):
             QPushButton#add_category_button:pressed {
                 background-color: #3e8e41;
             }
+
+            /* Chip lọc theo tag */
+            QPushButton#tag_chip, QPushButton#tag_mode_button {
+                background-color: #3c3c3c;
+                color: #cccccc;
+                padding: 3px 10px;
+                border-radius: 11px;
+                font-size: 12px;
+                text-transform: none;
+                letter-spacing: normal;
+            }
+            QPushButton#tag_chip:hover, QPushButton#tag_mode_button:hover {
+                background-color: #444444;
+            }
+            QPushButton#tag_chip[tag_state="include"] {
+                background-color: #007ACC;
+                color: white;
+            }
+            QPushButton#tag_chip[tag_state="exclude"] {
+                background-color: #CC293D;
+                color: white;
+            }
             
             /* QTableWidget - Data Display */
-            QTableWidget {
+            QTableWidget, QTableView {
                 background-color: #2D2D30; /* Slightly different background for table */
                 border: 1px solid #3c3c3c;
                 border-radius: 5px;
@@ -299,14 +1068,14 @@ class BookmarkManagerApp(QMainWindow):
                 selection-background-color: #007ACC; /* Blue selection */
                 selection-color: white;
             }
-            QTableWidget::item {
+            QTableWidget::item, QTableView::item {
                 padding: 8px;
             }
-            QTableWidget::item:selected {
+            QTableWidget::item:selected, QTableView::item:selected {
                 background-color: #007ACC;
                 color: white;
             }
-            QTableWidget QHeaderView::section {
+            QTableWidget QHeaderView::section, QTableView QHeaderView::section {
                 background-color: #3C3C3C;
                 color: #f0f0f0;
                 padding: 8px;
@@ -314,7 +1083,7 @@ class BookmarkManagerApp(QMainWindow):
                 border-bottom: 2px solid #007ACC; /* Accent border */
                 font-weight: 600;
             }
-            QTableWidget QTableCornerButton::section {
+            QTableWidget QTableCornerButton::section, QTableView QTableCornerButton::section {
                 background-color: #3C3C3C;
                 border: 1px solid #333333;
             }
@@ -371,7 +1140,8 @@ class BookmarkManagerApp(QMainWindow):
                 border-bottom: 2px solid #007ACC; /* Active indicator */
             }
             /* Styling cho nội dung bên trong mỗi tab (padding) */
-            QWidget[objectName^="category_tab_content_"] { /* Selects widgets whose name starts with category_tab_content_ */
+            QWidget[objectName^="category_tab_content_"],
+            QWidget[objectName^="collection_tab_content_"] { /* Selects widgets whose name starts with category_tab_content_ */
                 padding: 15px;
             }
         """)
@@ -409,23 +1179,27 @@ class BookmarkManagerApp(QMainWindow):
         title_input.setPlaceholderText("Bookmark Title")
         url_input = QLineEdit()
         url_input.setPlaceholderText("Bookmark URL (optional, e.g., https://example.com)")
+        tags_input = QLineEdit()
+        tags_input.setPlaceholderText("Tags (optional, comma separated)")
         add_button = QPushButton("ADD")
         
         add_button.clicked.connect(
-            lambda checked, cat=category_name, t_input=title_input, u_input=url_input: 
-            self.add_bookmark_to_category(cat, t_input, u_input)
+            lambda checked, cat=category_name, t_input=title_input, u_input=url_input, g_input=tags_input: 
+            self.add_bookmark_to_category(cat, t_input, u_input, g_input)
         )
 
         input_layout.addWidget(title_input)
         input_layout.addWidget(url_input)
+        input_layout.addWidget(tags_input)
         input_layout.addWidget(add_button)
         tab_layout.addLayout(input_layout)
 
         bookmark_table = QTableWidget(self)
-        bookmark_table.setColumnCount(2)
-        bookmark_table.setHorizontalHeaderLabels(["Title", "URL"])
+        bookmark_table.setColumnCount(3)
+        bookmark_table.setHorizontalHeaderLabels(["Title", "URL", "Tags"])
         bookmark_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
         bookmark_table.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)
+        bookmark_table.horizontalHeader().setSectionResizeMode(2, QHeaderView.Stretch)
         bookmark_table.setEditTriggers(QTableWidget.NoEditTriggers) 
         bookmark_table.setSelectionBehavior(QTableWidget.SelectRows)
         bookmark_table.setSelectionMode(QTableWidget.SingleSelection)
@@ -444,6 +1218,11 @@ class BookmarkManagerApp(QMainWindow):
             lambda checked, cat=category_name, table=bookmark_table: 
             self.open_selected_bookmark(cat, table)
         )
+        tags_button = QPushButton("EDIT TAGS")
+        tags_button.clicked.connect(
+            lambda checked, cat=category_name, table=bookmark_table: 
+            self.retag_selected_bookmark(cat, table)
+        )
         delete_button = QPushButton("DELETE SELECTED")
         delete_button.setObjectName("delete_button") # <-- ĐẶT OBJECT NAME Ở ĐÂY ĐỂ CSS BIẾT
         delete_button.clicked.connect(
@@ -452,15 +1231,18 @@ class BookmarkManagerApp(QMainWindow):
         )
         action_layout.addStretch()
         action_layout.addWidget(open_button)
+        action_layout.addWidget(tags_button)
         action_layout.addWidget(delete_button)
         tab_layout.addLayout(action_layout)
 
-        self.tab_widget.addTab(tab_content_widget, category_name)
+        # Category luôn nằm trước các tab smart collection
+        self.tab_widget.insertTab(self.tab_widget.count() - len(self.collection_widgets), tab_content_widget, category_name)
         
         self.category_widgets[category_name] = {
             "tab_widget_ref": tab_content_widget,
             "title_input": title_input,
             "url_input": url_input,
+            "tags_input": tags_input,
             "table": bookmark_table
         }
         self.populate_category_table(category_name)
@@ -477,6 +1259,20 @@ class BookmarkManagerApp(QMainWindow):
             self.categories_data = {}
             self.categories_data["General"] = []
             self.save_all_bookmarks()
+        self._normalize_loaded_tags()
+        self.tag_index.rebuild(self.categories_data)
+
+    def _normalize_loaded_tags(self):
+        """Chuẩn hoá 'tags' đọc từ file (có thể bị sửa tay) trước khi dựng index."""
+        for bookmarks in self.categories_data.values():
+            for bookmark in bookmarks:
+                if 'tags' not in bookmark:
+                    continue
+                tags = parse_tags(bookmark['tags'])
+                if tags:
+                    bookmark['tags'] = tags
+                else:
+                    del bookmark['tags']
 
     def save_all_bookmarks(self):
         """Lưu tất cả bookmark vào file JSON duy nhất."""
@@ -502,31 +1298,63 @@ class BookmarkManagerApp(QMainWindow):
             table.insertRow(row_idx)
             table.setItem(row_idx, 0, QTableWidgetItem(bookmark_item.get('title', 'No Title')))
             table.setItem(row_idx, 1, QTableWidgetItem(bookmark_item.get('url', ''))) 
+            table.setItem(row_idx, 2, QTableWidgetItem(', '.join(bookmark_item.get('tags', []))))
+        self._apply_tag_filter_to_category(category_name)
+
+    def _build_bookmark(self, title, url, tags=None):
+        new_bookmark = {'title': title, 'added': datetime.now().isoformat(timespec='seconds')}
+        if url:
+            if not url.startswith('http://') and not url.startswith('https://'):
+                url = 'https://' + url
+            new_bookmark['url'] = url
+        if tags:
+            new_bookmark['tags'] = tags
+        return new_bookmark
+
+    def _append_rows_to_category_table(self, category_name, new_bookmarks):
+        """Chỉ thêm các dòng mới vào cuối bảng thay vì điền lại toàn bộ."""
+        if category_name not in self.category_widgets:
+            return
 
-    def add_bookmark_to_category(self, category_name, title_input_widget, url_input_widget):
+        table = self.category_widgets[category_name]["table"]
+        table.setUpdatesEnabled(False)
+        first_row = table.rowCount()
+        table.setRowCount(first_row + len(new_bookmarks))
+        for offset, bookmark_item in enumerate(new_bookmarks):
+            table.setItem(first_row + offset, 0, QTableWidgetItem(bookmark_item.get('title', 'No Title')))
+            table.setItem(first_row + offset, 1, QTableWidgetItem(bookmark_item.get('url', '')))
+            table.setItem(first_row + offset, 2, QTableWidgetItem(', '.join(bookmark_item.get('tags', []))))
+        self._apply_tag_filter_to_category(category_name, first_row)
+        table.setUpdatesEnabled(True)
+
+    def add_bookmark_to_category(self, category_name, title_input_widget, url_input_widget, tags_input_widget):
         """Thêm bookmark vào category được chỉ định."""
         title = title_input_widget.text().strip()
         url = url_input_widget.text().strip()
+        tags = parse_tags(tags_input_widget.text())
 
         if not title:
             QMessageBox.warning(self, "Input Error", "Please enter a title for the bookmark.")
             return
 
-        new_bookmark = {'title': title}
-        if url:
-            if not url.startswith('http://') and not url.startswith('https://'):
-                url = 'https://' + url
-            new_bookmark['url'] = url
+        new_bookmark = self._build_bookmark(title, url, tags)
 
         self.categories_data.setdefault(category_name, []).append(new_bookmark)
+        self.tag_index.add(new_bookmark)
         self.save_all_bookmarks()
         self.populate_category_table(category_name)
+        self.update_collections_added([(category_name, new_bookmark)])
+        if tags:
+            self.refresh_tag_chips()
         
         title_input_widget.clear()
         url_input_widget.clear()
+        tags_input_widget.clear()
         table = self.category_widgets[category_name]["table"]
         table.scrollToBottom()
-        table.selectRow(len(self.categories_data[category_name]) - 1)
+        new_row = len(self.categories_data[category_name]) - 1
+        if not table.isRowHidden(new_row):
+            table.selectRow(new_row)
 
     def delete_selected_bookmark(self, category_name, table_widget):
         """Xóa bookmark đã chọn từ bảng của category cụ thể."""
@@ -546,8 +1374,12 @@ class BookmarkManagerApp(QMainWindow):
 
         if reply == QMessageBox.Yes:
             del self.categories_data[category_name][row_index]
+            self.tag_index.remove(bookmark_to_delete)
             self.save_all_bookmarks()
             self.populate_category_table(category_name)
+            self.update_collections_removed([bookmark_to_delete])
+            if bookmark_to_delete.get('tags'):
+                self.refresh_tag_chips()
             
             if not self.categories_data[category_name]:
                 reply_delete_category = QMessageBox.question(self, 'Delete Category',
@@ -557,6 +1389,85 @@ class BookmarkManagerApp(QMainWindow):
                     self.delete_category(category_name)
 
 
+    def retag_selected_bookmark(self, category_name, table_widget):
+        """Sửa tags của bookmark đã chọn."""
+        selected_rows = table_widget.selectionModel().selectedRows()
+        if not selected_rows:
+            QMessageBox.information(self, "Selection", "Please select a bookmark to tag.")
+            return
+
+        row_index = selected_rows[0].row()
+        bookmark = self.categories_data[category_name][row_index]
+        text, ok = QInputDialog.getText(self, "Edit Tags", "Tags (comma separated):",
+                                        QLineEdit.Normal, ', '.join(bookmark.get('tags', [])))
+        if not ok:
+            return
+
+        self.tag_index.retag(bookmark, parse_tags(text))
+        self.save_all_bookmarks()
+        table_widget.setItem(row_index, 2, QTableWidgetItem(', '.join(bookmark.get('tags', []))))
+        self.update_collections_changed(category_name, bookmark)
+        self.refresh_tag_chips()
+        if self.tag_filter_bar.is_active():
+            self.apply_tag_filter()
+
+    def refresh_tag_chips(self):
+        self.tag_filter_bar.set_tags(self.tag_index.tags())
+
+    def apply_tag_filter(self):
+        """Chip thay đổi: lọc lại ngay tab đang mở, các tab khác lọc khi được mở."""
+        self.tag_filter_version = None
+        for widgets in list(self.category_widgets.values()) + list(self.collection_widgets.values()):
+            widgets["filter_dirty"] = True
+        self.apply_tag_filter_to_current_tab()
+
+    def apply_tag_filter_to_current_tab(self):
+        current_tab = self.tab_widget.currentWidget()
+        for category_name, widgets in self.category_widgets.items():
+            if widgets["tab_widget_ref"] is current_tab and widgets.get("filter_dirty"):
+                self._apply_tag_filter_to_category(category_name)
+        for collection_name, widgets in self.collection_widgets.items():
+            if widgets["tab_widget_ref"] is current_tab and widgets.get("filter_dirty"):
+                self._apply_tag_filter_to_collection(collection_name)
+
+    def _current_tag_filter(self):
+        """Bitmap (bytes) các bookmark khớp chip hiện tại, hoặc None nếu không lọc.
+
+        Tính lại khi chip hoặc tag index thay đổi, nên bookmark mới thêm cũng
+        được kiểm tra theo trạng thái chip hiện tại.
+        """
+        if not self.tag_filter_bar.is_active():
+            return None
+        if self.tag_filter_version != self.tag_index.version:
+            included = self.tag_filter_bar.included_tags()
+            excluded = self.tag_filter_bar.excluded_tags()
+            if self.tag_filter_bar.match_any:
+                bitmap = self.tag_index.query(any_of=included, none_of=excluded)
+            else:
+                bitmap = self.tag_index.query(all_of=included, none_of=excluded)
+            self.tag_filter_bytes = self.tag_index.bytes_from_bitmap(bitmap)
+            self.tag_filter_version = self.tag_index.version
+        return self.tag_filter_bytes
+
+    def _apply_tag_filter_to_rows(self, table, bookmarks, first_row):
+        """bookmarks: các bookmark theo thứ tự, bắt đầu từ dòng first_row."""
+        filter_bytes = self._current_tag_filter()
+        for row_idx, bookmark in enumerate(bookmarks, start=first_row):
+            if filter_bytes is None:
+                table.setRowHidden(row_idx, False)
+            else:
+                table.setRowHidden(row_idx, not self.tag_index.has_bit(filter_bytes, bookmark))
+
+    def _apply_tag_filter_to_category(self, category_name, first_row=0):
+        if category_name not in self.category_widgets:
+            return
+
+        widgets = self.category_widgets[category_name]
+        bookmarks = self.categories_data.get(category_name, [])
+        self._apply_tag_filter_to_rows(widgets["table"], itertools.islice(bookmarks, first_row, None), first_row)
+        if first_row == 0:
+            widgets["filter_dirty"] = False
+
     def open_selected_bookmark(self, category_name, table_widget):
         """Mở URL của bookmark đã chọn (nếu có)."""
         selected_rows = table_widget.selectionModel().selectedRows()
@@ -607,10 +1518,14 @@ class BookmarkManagerApp(QMainWindow):
             if tab_index != -1:
                 self.tab_widget.removeTab(tab_index)
             
+            for bookmark in self.categories_data[category_name]:
+                self.tag_index.remove(bookmark)
+            self.update_collections_removed(self.categories_data[category_name])
             del self.categories_data[category_name]
             del self.category_widgets[category_name]
             
             self.save_all_bookmarks()
+            self.refresh_tag_chips()
             QMessageBox.information(self, "Category Deleted", f"Category '{category_name}' has been deleted.")
             
             if not self.categories_data:
@@ -632,6 +1547,287 @@ class BookmarkManagerApp(QMainWindow):
             QMessageBox.warning(self, "No Active Category", "Please select or create a category first.")
 
 
+    # --- Smart Collection Methods ---
+    def load_smart_collections(self):
+        definitions = DEFAULT_SMART_COLLECTIONS
+        if os.path.exists(SMART_COLLECTIONS_FILE):
+            try:
+                with open(SMART_COLLECTIONS_FILE, 'r', encoding='utf-8') as f:
+                    definitions = json.load(f)
+            except json.JSONDecodeError:
+                definitions = []
+                QMessageBox.warning(self, "Error", f"Could not load collections from {SMART_COLLECTIONS_FILE}. Invalid JSON format.")
+        if not isinstance(definitions, list):
+            definitions = []
+
+        for definition in definitions:
+            model = SmartCollectionModel.from_dict(definition, self)
+            if model is None:
+                continue
+            model.rebuild(self.categories_data)
+            self.smart_collections[model.name] = model
+
+        if not os.path.exists(SMART_COLLECTIONS_FILE):
+            self.save_smart_collections()
+
+    def save_smart_collections(self):
+        """Lưu định nghĩa các smart collection (không lưu kết quả)."""
+        with open(SMART_COLLECTIONS_FILE, 'w', encoding='utf-8') as f:
+            json.dump([model.to_dict() for model in self.smart_collections.values()], f, indent=4, ensure_ascii=False)
+
+    def init_collection_tabs(self):
+        for collection_name in self.smart_collections:
+            self._create_and_add_collection_tab(collection_name)
+
+        self.collection_refresh_timer = QTimer(self)
+        self.collection_refresh_timer.setInterval(SMART_COLLECTION_REFRESH_MS)
+        self.collection_refresh_timer.timeout.connect(self.refresh_time_based_collections)
+        self.collection_refresh_timer.start()
+
+    def _create_and_add_collection_tab(self, collection_name):
+        model = self.smart_collections[collection_name]
+
+        tab_content_widget = QWidget()
+        tab_content_widget.setObjectName(f"collection_tab_content_{collection_name.replace(' ', '_')}")
+        tab_layout = QVBoxLayout(tab_content_widget)
+        tab_layout.setContentsMargins(15, 15, 15, 15)
+        tab_layout.setSpacing(10)
+
+        description = SMART_COLLECTION_KINDS[model.kind]
+        if model.value is not None:
+            description += f": {model.value}"
+        tab_layout.addWidget(QLabel(description))
+
+        bookmark_table = QTableView(self)
+        bookmark_table.setModel(model)
+        for column in range(model.columnCount()):
+            bookmark_table.horizontalHeader().setSectionResizeMode(column, QHeaderView.Stretch)
+        bookmark_table.setEditTriggers(QTableView.NoEditTriggers)
+        bookmark_table.setSelectionBehavior(QTableView.SelectRows)
+        bookmark_table.setSelectionMode(QTableView.SingleSelection)
+        bookmark_table.doubleClicked.connect(
+            lambda index, name=collection_name, table=bookmark_table: 
+            self.open_selected_collection_bookmark(name, table)
+        )
+        tab_layout.addWidget(bookmark_table)
+
+        action_layout = QHBoxLayout()
+        action_layout.setSpacing(10)
+
+        open_button = QPushButton("OPEN SELECTED")
+        open_button.clicked.connect(
+            lambda checked, name=collection_name, table=bookmark_table: 
+            self.open_selected_collection_bookmark(name, table)
+        )
+        delete_button = QPushButton("DELETE COLLECTION")
+        delete_button.setObjectName("delete_button")
+        delete_button.clicked.connect(
+            lambda checked, name=collection_name: self.delete_collection(name)
+        )
+        action_layout.addStretch()
+        action_layout.addWidget(open_button)
+        action_layout.addWidget(delete_button)
+        tab_layout.addLayout(action_layout)
+
+        self.tab_widget.addTab(tab_content_widget, f"★ {collection_name}")
+
+        self.collection_widgets[collection_name] = {
+            "tab_widget_ref": tab_content_widget,
+            "table": bookmark_table
+        }
+        # Giữ bộ lọc tag cho các dòng được model thêm/xoá về sau
+        model.rowsInserted.connect(
+            lambda parent, first, last, name=collection_name: self._apply_tag_filter_to_collection(name, first)
+        )
+        model.modelReset.connect(
+            lambda name=collection_name: self._apply_tag_filter_to_collection(name)
+        )
+        self._apply_tag_filter_to_collection(collection_name)
+
+    def _apply_tag_filter_to_collection(self, collection_name, first_row=0):
+        if collection_name not in self.collection_widgets:
+            return
+
+        widgets = self.collection_widgets[collection_name]
+        model = self.smart_collections[collection_name]
+        self._apply_tag_filter_to_rows(widgets["table"], model.iter_bookmarks(first_row), first_row)
+        if first_row == 0:
+            widgets["filter_dirty"] = False
+
+    def update_collections_added(self, pairs):
+        for model in self.smart_collections.values():
+            model.add_bookmarks(pairs)
+
+    def update_collections_removed(self, bookmarks):
+        for model in self.smart_collections.values():
+            model.remove_bookmarks(bookmarks)
+
+    def update_collections_changed(self, category_name, bookmark):
+        for model in self.smart_collections.values():
+            model.update_bookmark(category_name, bookmark)
+
+    def refresh_time_based_collections(self):
+        """Bookmark có thể rơi khỏi collection theo thời gian mà không có thay đổi nào."""
+        for model in self.smart_collections.values():
+            if model.is_time_based():
+                model.rebuild(self.categories_data)
+
+    def open_selected_collection_bookmark(self, collection_name, table_view):
+        selected_rows = table_view.selectionModel().selectedRows()
+        if not selected_rows:
+            QMessageBox.information(self, "Selection", "Please select a bookmark to open.")
+            return
+
+        bookmark = self.smart_collections[collection_name].bookmark_at(selected_rows[0].row())
+        url = bookmark.get('url')
+        if url:
+            QDesktopServices.openUrl(QUrl(url))
+        else:
+            QMessageBox.information(self, "No URL", "Selected bookmark does not have an associated URL.")
+
+    def prompt_new_collection(self):
+        """Tạo smart collection mới từ một truy vấn."""
+        kind_labels = list(SMART_COLLECTION_KINDS.values())
+        label, ok = QInputDialog.getItem(self, "New Collection", "Show bookmarks where:", kind_labels, 0, False)
+        if not ok:
+            return
+        kind = list(SMART_COLLECTION_KINDS.keys())[kind_labels.index(label)]
+
+        value = None
+        if kind == 'added_within_days':
+            value, ok = QInputDialog.getInt(self, "New Collection", "Number of days:", 7, 1, 3650)
+            if not ok:
+                return
+        elif kind != 'no_url':
+            value, ok = QInputDialog.getText(self, "New Collection", f"{label}:")
+            value = value.strip()
+            if not ok or not value:
+                return
+
+        if kind == 'no_url':
+            default_name = label
+        elif kind == 'added_within_days':
+            default_name = f"Last {value} Days"
+        else:
+            default_name = value
+        collection_name, ok = QInputDialog.getText(self, "New Collection", "Collection name:", QLineEdit.Normal, default_name)
+        collection_name = collection_name.strip()
+        if not ok or not collection_name:
+            return
+        if collection_name in self.smart_collections:
+            QMessageBox.warning(self, "Collection Exists", f"Collection '{collection_name}' already exists.")
+            return
+
+        model = SmartCollectionModel(collection_name, kind, value, self)
+        model.rebuild(self.categories_data)
+        self.smart_collections[collection_name] = model
+        self.save_smart_collections()
+        self._create_and_add_collection_tab(collection_name)
+        self.tab_widget.setCurrentIndex(self.tab_widget.indexOf(self.collection_widgets[collection_name]["tab_widget_ref"]))
+
+    def delete_collection(self, collection_name):
+        reply = QMessageBox.question(self, 'Delete Collection',
+                                     f"Delete the collection '{collection_name}'? Its bookmarks are not deleted.",
+                                     QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
+        if reply != QMessageBox.Yes:
+            return
+
+        tab_index = self.tab_widget.indexOf(self.collection_widgets[collection_name]["tab_widget_ref"])
+        if tab_index != -1:
+            self.tab_widget.removeTab(tab_index)
+        del self.collection_widgets[collection_name]
+        self.smart_collections.pop(collection_name).deleteLater()
+        self.save_smart_collections()
+
+
+    # --- IPC Methods ---
+    def init_ipc_server(self):
+        self.ipc_flush_timer = QTimer(self)
+        self.ipc_flush_timer.setSingleShot(True)
+        self.ipc_flush_timer.setInterval(IPC_FLUSH_INTERVAL_MS)
+        self.ipc_flush_timer.timeout.connect(self.flush_pending_bookmarks)
+
+        if self.ipc_server is None:
+            self.ipc_server = BookmarkIpcServer()
+        self.ipc_server.setParent(self)
+        self.ipc_server.command_received.connect(self.handle_ipc_command)
+        self.ipc_server.start()
+        if self.ipc_server.listen_errors:
+            self.tray_icon.showMessage(
+                "Bookmark Manager",
+                "\n".join(self.ipc_server.listen_errors),
+                QSystemTrayIcon.Warning,
+                5000
+            )
+        QApplication.instance().aboutToQuit.connect(self.shutdown_ipc)
+
+    def handle_ipc_command(self, command):
+        """Xử lý lệnh từ instance khác / extension. Lệnh add được gom lại để lưu một lần.
+
+        Payload đến từ bên ngoài nên từng trường được kiểm tra kiểu; lệnh sai bị bỏ qua.
+        """
+        if not isinstance(command, dict):
+            return
+
+        cmd = command.get('cmd')
+        if cmd == 'show':
+            self.show()
+            self.raise_()
+            self.activateWindow()
+        elif cmd == 'add':
+            items = command.get('bookmarks', [command])
+            if not isinstance(items, list):
+                return
+
+            new_items = []
+            for item in items:
+                if not isinstance(item, dict):
+                    continue
+                title = self._ipc_text(item, 'title')
+                if not title:
+                    continue
+                category_name = self._ipc_text(item, 'category') or "General"
+                url = self._ipc_text(item, 'url')
+                tags = parse_tags(item.get('tags'))
+                new_items.append((category_name, self._build_bookmark(title, url, tags)))
+
+            self.pending_ipc_bookmarks.extend(new_items)
+            if self.pending_ipc_bookmarks and not self.ipc_flush_timer.isActive():
+                self.ipc_flush_timer.start()
+
+    def _ipc_text(self, item, key):
+        value = item.get(key)
+        return value.strip() if isinstance(value, str) else ''
+
+    def flush_pending_bookmarks(self):
+        """Ghi tất cả bookmark đang chờ: một lần lưu file, một lần cập nhật mỗi bảng."""
+        if not self.pending_ipc_bookmarks:
+            return
+
+        pending, self.pending_ipc_bookmarks = self.pending_ipc_bookmarks, []
+        added_by_category = {}
+        for category_name, bookmark in pending:
+            added_by_category.setdefault(category_name, []).append(bookmark)
+
+        for category_name, new_bookmarks in added_by_category.items():
+            self.categories_data.setdefault(category_name, []).extend(new_bookmarks)
+            for bookmark in new_bookmarks:
+                self.tag_index.add(bookmark)
+        self.save_all_bookmarks()
+        self.refresh_tag_chips()
+
+        for category_name, new_bookmarks in added_by_category.items():
+            if category_name in self.category_widgets:
+                self._append_rows_to_category_table(category_name, new_bookmarks)
+            else:
+                self._create_and_add_category_tab(category_name)
+        self.update_collections_added(pending)
+
+    def shutdown_ipc(self):
+        self.flush_pending_bookmarks()
+        self.ipc_server.close()
+
+
     # --- Window Control Methods ---
     def toggle_maximize_restore(self):
         if self.isMaximized():
@@ -700,6 +1896,17 @@ class BookmarkManagerApp(QMainWindow):
 
 if __name__ == '__main__':
     app = QApplication(sys.argv)
+    command = parse_command_line(sys.argv[1:])
+
+    # Đã có instance đang chạy -> chuyển lệnh sang đó rồi thoát
+    if send_to_running_instance(command):
+        sys.exit(0)
+
+    # Giữ socket ngay, trước khi load dữ liệu (có thể mất vài giây với store lớn),
+    # để lần chạy tiếp theo trong lúc đó vẫn chuyển lệnh sang instance này
+    ipc_server = BookmarkIpcServer()
+    if not ipc_server.is_listening() and send_to_running_instance(command):
+        sys.exit(0) # Instance khác vừa giành được socket
     
     if not QSystemTrayIcon.isSystemTrayAvailable():
         QMessageBox.critical(None, "Tray Icon Error", "System tray not available.")
@@ -707,6 +1914,8 @@ if __name__ == '__main__':
 
     app.setQuitOnLastWindowClosed(False)
 
-    window = BookmarkManagerApp()
+    window = BookmarkManagerApp(ipc_server)
     window.show()
+    if command['cmd'] != 'show':
+        window.handle_ipc_command(command)
     sys.exit(app.exec_())
\ No newline at end of file